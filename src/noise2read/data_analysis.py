@@ -8,7 +8,7 @@ from collections import Counter
 import collections
 import math
 import os
-import editdistance
+from rapidfuzz.distance import Levenshtein
 import xlsxwriter
 from noise2read.utils import *
 import numpy as np
@@ -291,7 +291,7 @@ class DataAnalysis():
             r_seq2counts = collections.Counter(raw_seqs)
             if len(r_seqs) > 1:
                 for r_seq in r_seqs:
-                    t_r_dis = editdistance.eval(t_seq, r_seq)
+                    t_r_dis = Levenshtein.distance(t_seq, r_seq)
                     # if t_r_dis == 1 or t_r_dis == 2:
                     if t_r_dis == 1:
                         r_seq_count = raw_read2count[r_seq]
@@ -307,7 +307,7 @@ class DataAnalysis():
                 raw_seq = raw_seqs[i]
                 true_seq = true_seqs[i]
                 seq_len = len(true_seq)
-                true_raw_dis = editdistance.eval(true_seq, raw_seq)
+                true_raw_dis = Levenshtein.distance(true_seq, raw_seq)
                 # raw base level
                 total_positive_bases += true_raw_dis
                 total_negative_bases += seq_len - true_raw_dis
@@ -320,7 +320,7 @@ class DataAnalysis():
                     total_positive_reads += 1
                 # after correction
                 correct_seq = correct_seqs[i]
-                true_cor_dis = editdistance.eval(true_seq, correct_seq)
+                true_cor_dis = Levenshtein.distance(true_seq, correct_seq)
                 # correction base level
                 cor_positive_bases += true_cor_dis
                 cor_negative_bases += seq_len - true_cor_dis
@@ -926,9 +926,9 @@ class DataAnalysis():
             raw_seq = str(error_records[name].seq)
             correct_seq = str(correct_records[name].seq)
 
-            true_raw_dis = editdistance.eval(true_seq, raw_seq)
-            true_cor_dis = editdistance.eval(true_seq, correct_seq)
-            raw_cor_dis = editdistance.eval(raw_seq, correct_seq)
+            true_raw_dis = Levenshtein.distance(true_seq, raw_seq)
+            true_cor_dis = Levenshtein.distance(true_seq, correct_seq)
+            raw_cor_dis = Levenshtein.distance(raw_seq, correct_seq)
             #
             if true_cor_dis == 0:
                 correct_errfree_seqs.append(correct_seq)
@@ -4,20 +4,348 @@
 # @Last Modified by:   Pengyao Ping
 # @Last Modified time: 2023-09-05 23:40:46
 
-import editdistance
 import networkx as nx
+import numpy as np
 import os
 from noise2read.utils import *
+from numba import njit
 from mpire import WorkerPool
 import matplotlib.pyplot as plt
 from networkx.drawing.nx_agraph import graphviz_layout
 from collections import Counter
+from itertools import chain
+import csv
+import queue
+import threading
 import sys
 import pandas as pd
 # from noise2read.utils import MemoryMonitor
 # import gc
 # import multiprocessing
 
+# output extension for each input file type recognised by parse_file_type
+_OUT_EXT = {
+    'fastq': 'fastq', 'fq': 'fastq', 'fastq.gz': 'fastq', 'fq.gz': 'fastq',
+    'fasta': 'fasta', 'fa': 'fasta', 'fasta.gz': 'fasta', 'fas.gz': 'fasta',
+}
+
+@njit(cache=True)
+def _ed1_sub_neighbors(read_arr):
+    """
+    enumerate all single-base substitution neighbours of an encoded read
+
+    Args:
+        read_arr (ndarray): A read encoded as a uint8 ascii array.
+
+    Returns:
+        ndarray: 2D uint8 array with one candidate read per row
+    """
+    n = read_arr.shape[0]
+    out = np.empty((3 * n, n), np.uint8)
+    k = 0
+    for i in range(n):
+        orig = read_arr[i]
+        # skip non-ACGT positions as sub_base does for N
+        if orig != 65 and orig != 67 and orig != 71 and orig != 84:
+            continue
+        for base in (65, 67, 71, 84):
+            if base != orig:
+                out[k] = read_arr
+                out[k, i] = base
+                k += 1
+    return out[:k]
+
+@njit(cache=True)
+def _ed2_sub_rows(read_arr, mat):
+    """
+    scan a matrix of equal-length encoded reads for double-substitution hits
+
+    Args:
+        read_arr (ndarray): A read encoded as a uint8 ascii array.
+        mat (ndarray): 2D uint8 array with one encoded low-frequency read per row.
+
+    Returns:
+        ndarray: indices of the rows differing from the read at exactly two
+        ACGT positions
+    """
+    m = mat.shape[0]
+    n = mat.shape[1]
+    out = np.empty(m, np.int64)
+    k = 0
+    for i in range(m):
+        diff = 0
+        ok = True
+        for j in range(n):
+            a = read_arr[j]
+            b = mat[i, j]
+            if a != b:
+                diff += 1
+                if diff > 2:
+                    ok = False
+                    break
+                # only ACGT bases take part in substitutions (N positions
+                # never substitute, matching sub_base)
+                if not (a == 65 or a == 67 or a == 71 or a == 84):
+                    ok = False
+                    break
+                if not (b == 65 or b == 67 or b == 71 or b == 84):
+                    ok = False
+                    break
+        if ok and diff == 2:
+            out[k] = i
+            k += 1
+    return out[:k]
+
+@njit(cache=True)
+def _pack_reads_2bit(mat):
+    """
+    pack ascii-encoded ACGT reads into 2-bit codes, 32 bases per uint64 word
+
+    Args:
+        mat (ndarray): 2D uint8 array with one encoded read per row.
+
+    Returns:
+        ndarray: 2D uint64 array of packed words, one row per read
+    """
+    m = mat.shape[0]
+    n = mat.shape[1]
+    w = (n + 31) // 32
+    out = np.zeros((m, w), np.uint64)
+    for i in range(m):
+        for j in range(n):
+            b = mat[i, j]
+            if b == 67:
+                code = 1
+            elif b == 71:
+                code = 2
+            elif b == 84:
+                code = 3
+            else:
+                code = 0
+            out[i, j >> 5] |= np.uint64(code) << np.uint64((j & 31) * 2)
+    return out
+
+@njit(cache=True)
+def _ed2_packed_rows(read_words, mat_words):
+    """
+    scan packed reads for rows at exactly two substitutions from the query
+
+    Args:
+        read_words (ndarray): packed uint64 words of the query read.
+        mat_words (ndarray): 2D uint64 array of packed low-frequency reads.
+
+    Returns:
+        ndarray: indices of the rows differing at exactly two positions
+    """
+    m = mat_words.shape[0]
+    w = mat_words.shape[1]
+    out = np.empty(m, np.int64)
+    k = 0
+    for i in range(m):
+        diff = 0
+        for j in range(w):
+            x = read_words[j] ^ mat_words[i, j]
+            # fold each 2-bit base mismatch down to one bit, then count
+            y = (x | (x >> np.uint64(1))) & np.uint64(0x5555555555555555)
+            while y != np.uint64(0):
+                y &= y - np.uint64(1)
+                diff += 1
+                if diff > 2:
+                    break
+            if diff > 2:
+                break
+        if diff == 2:
+            out[k] = i
+            k += 1
+    return out[:k]
+
+def _real_ed1_seqs(seq_ids, read):
+    """
+    given a read, generate all its 1nt-edit-distance read counterparts existing in the dataset to form the edges
+
+    Args:
+        seq_ids (dict): Mapping from every encoded unique read to its integer id.
+        read (str): A DNA/RNA sequence.
+
+    Returns:
+        list: list of integer id pairs of reads with only one base different
+    """
+    # test candidates directly against the pre-encoded read index instead of
+    # materialising the full ~3L candidate list per read via
+    # enumerate_ed1_seqs; the returned edges stay integer pairs so the
+    # result payload is small and never re-hashes read strings
+    raw = read.encode()
+    n = len(raw)
+    hits = set()
+    # substitutions via the compiled kernel
+    for row in _ed1_sub_neighbors(np.frombuffer(raw, np.uint8)):
+        hit = seq_ids.get(row.tobytes())
+        if hit is not None:
+            hits.add(hit)
+    # deletions
+    for i in range(n):
+        hit = seq_ids.get(raw[:i] + raw[i+1:])
+        if hit is not None:
+            hits.add(hit)
+    # insertions
+    for i in range(n + 1):
+        head = raw[:i]
+        tail = raw[i:]
+        for base in b"ACGT":
+            hit = seq_ids.get(head + bytes((base,)) + tail)
+            if hit is not None:
+                hits.add(hit)
+    read_id = seq_ids[raw]
+    edges = [(read_id, hit) for hit in hits]
+    return edges
+
+def _real_ed2_seqs(low_by_len, read):
+    """
+    given a read, generate all its 2nt-edit-distance substitution counterparts existing in the dataset to form the edges
+
+    Args:
+        low_by_len (dict): Low-frequency reads grouped by length, each entry an
+            encoded uint8 matrix paired with the read list in row order.
+        read (str): A DNA/RNA sequence.
+
+    Returns:
+        list: list of tuples of read pairs with two bases different
+    """
+    # compare the read against every same-length low-frequency read in one
+    # compiled pass instead of enumerating the ~4.5L^2 candidate set via
+    # enumerate_ed2_seqs
+    entry = low_by_len.get(len(read))
+    if entry is None:
+        return []
+    words_mat, pure_ids, other_mat, other_ids, byte_mat, seqs = entry
+    read_arr = np.frombuffer(read.encode(), np.uint8)
+    acgt = (read_arr == 65) | (read_arr == 67) | (read_arr == 71) | (read_arr == 84)
+    edges = []
+    if acgt.all():
+        # pure-ACGT reads compare 32 bases per XOR word against the packed
+        # rows; only rows holding non-ACGT characters need the byte scan
+        if words_mat.shape[0] > 0:
+            read_words = _pack_reads_2bit(read_arr.reshape(1, -1))[0]
+            for r in _ed2_packed_rows(read_words, words_mat):
+                edges.append((read, seqs[pure_ids[r]]))
+        if other_mat.shape[0] > 0:
+            for r in _ed2_sub_rows(read_arr, other_mat):
+                edges.append((read, seqs[other_ids[r]]))
+    else:
+        for r in _ed2_sub_rows(read_arr, byte_mat):
+            edges.append((read, seqs[r]))
+    return edges
+
+def _ed1_edges_for_chunk(shared_obs, ci):
+    """search 1nt-edit-distance edges for one chunk of high-frequency reads"""
+    seq_ids, groups = shared_obs
+    edges = []
+    for read in groups[ci]:
+        edges.extend(_real_ed1_seqs(seq_ids, read))
+    return edges
+
+def _ed2_edges_for_chunk(shared_obs, ci):
+    """search 2nt-edit-distance edges for one chunk of high-frequency reads"""
+    low_seqs, groups = shared_obs
+    edges = []
+    for read in groups[ci]:
+        edges.extend(_real_ed2_seqs(low_seqs, read))
+    return edges
+
+def _reverse_err_row(row):
+    """
+    derive the EndRead-to-StartRead high-ambiguous row from the classified
+    StartRead-to-EndRead one
+
+    Args:
+        row (list): a classified row [StartRead, StartReadCount, StartDegree,
+        ErrorTye, ErrorPosition, StartErrKmer, EndErrKmer, EndRead,
+        EndReadCount, EndDegree].
+
+    Returns:
+        list: the row for the same edge seen from the other read: read
+        fields and kmers swapped, error type inverted, position kept
+    """
+    first, second = row[3].split('-')
+    return [row[7], row[8], row[9],
+            second + '-' + first, row[4],
+            row[6], row[5],
+            row[0], row[1], row[2]]
+
+def _graph_to_csr(graph):
+    """
+    flatten a read graph into CSR adjacency plus parallel node arrays
+
+    Args:
+        graph (object): A graph constructed using NetworkX.
+
+    Returns:
+        tuple: (nodes, id_of, indptr, indices, counts) where neighbours of
+        node i are indices[indptr[i]:indptr[i+1]] and counts[i] is its read
+        frequency
+    """
+    nodes = list(graph.nodes)
+    id_of = {node: i for i, node in enumerate(nodes)}
+    node_num = len(nodes)
+    indptr = np.zeros(node_num + 1, dtype=np.int64)
+    counts = np.empty(node_num, dtype=np.int64)
+    for i, node in enumerate(nodes):
+        counts[i] = graph.nodes[node]['count']
+        indptr[i + 1] = indptr[i] + graph.degree[node]
+    indices = np.empty(indptr[-1], dtype=np.int64)
+    next_slot = indptr[:-1].copy()
+    for u, v in graph.edges():
+        ui = id_of[u]
+        vi = id_of[v]
+        indices[next_slot[ui]] = vi
+        next_slot[ui] += 1
+        indices[next_slot[vi]] = ui
+        next_slot[vi] += 1
+    return nodes, id_of, indptr, indices, counts
+
+@njit(cache=True)
+def _walk_components(indptr, indices):
+    """label each node with its connected component id via iterative BFS"""
+    node_num = indptr.shape[0] - 1
+    labels = np.full(node_num, -1, dtype=np.int64)
+    stack = np.empty(node_num, dtype=np.int64)
+    label = 0
+    for start in range(node_num):
+        if labels[start] != -1:
+            continue
+        labels[start] = label
+        stack[0] = start
+        top = 1
+        while top > 0:
+            top -= 1
+            u = stack[top]
+            for k in range(indptr[u], indptr[u + 1]):
+                v = indices[k]
+                if labels[v] == -1:
+                    labels[v] = label
+                    stack[top] = v
+                    top += 1
+        label += 1
+    return label, labels
+
+def _csr_components(indptr, indices, min_size=1):
+    """
+    label connected components over CSR adjacency in one compiled traversal
+
+    Args:
+        indptr (ndarray): CSR index pointer array of the read graph.
+        indices (ndarray): CSR neighbour array of the read graph.
+        min_size (int, optional): Smallest component to keep. Defaults to 1.
+
+    Returns:
+        list: one int64 array of node ids per kept connected component
+    """
+    comp_num, labels = _walk_components(indptr, indices)
+    order = np.argsort(labels, kind='stable')
+    boundaries = np.searchsorted(labels[order], np.arange(comp_num + 1))
+    sizes = np.diff(boundaries)
+    return [order[boundaries[k]:boundaries[k + 1]] for k in range(comp_num) if sizes[k] >= min_size]
+
 class DataGneration():
     """
     A class to generate genuine and ambiguous errors from 1nt/2nt-edit-distance-based graphs construted from short reads dataset
@@ -52,9 +380,14 @@ class DataGneration():
         
         self.file_type = parse_file_type(self.config.input_file)
         if ".gz" in self.file_type:
-            self.out_file_tye = self.file_type.split(".gz")[0] 
+            self.out_file_tye = self.file_type.split(".gz")[0]
         else:
             self.out_file_tye = self.file_type
+        # warm the numba cache before any worker processes are forked
+        _ed1_sub_neighbors(np.frombuffer(b"ACGT", np.uint8))
+        _ed2_sub_rows(np.frombuffer(b"ACGT", np.uint8), np.frombuffer(b"AGGT", np.uint8).reshape(1, 4))
+        _ed2_packed_rows(_pack_reads_2bit(np.frombuffer(b"ACGT", np.uint8).reshape(1, 4))[0], _pack_reads_2bit(np.frombuffer(b"AGGT", np.uint8).reshape(1, 4)))
+        _walk_components(np.array([0, 1, 2], dtype=np.int64), np.array([1, 0], dtype=np.int64))
 
     def graph_summary(self, graph):
         """
@@ -80,23 +413,23 @@ class DataGneration():
         """
         read1 = line[0]
         read1_fre = line[1]
-        read2 = line[3]   
-        read2_fre = line[4] 
+        read2 = line[3]
+        read2_fre = line[4]
 
         f_len = len(read1)
-        s_len = len(read2)  
-        # position = -1  
-        dis = editdistance.eval(read1, read2)
-        # print(dis)
-        if dis == 1:              
+        s_len = len(read2)
+        # position = -1
+        # the input reads are known 1nt-edit-distance neighbours (graph edges),
+        # so locate the differing base with a direct scan instead of running a
+        # generic edit distance computation first
+        if abs(f_len - s_len) <= 1:
             if f_len == s_len:
-                position = -1
-                for index in range(f_len):
-                    if read1[index] == read2[index]:
-                        continue
-                    else:
-                        position = index
-                        break
+                # a vectorized XOR locates the differing base without a
+                # per-character Python loop
+                diff = np.frombuffer(read1.encode(), np.uint8) ^ np.frombuffer(read2.encode(), np.uint8)
+                if not diff.any():
+                    raise ValueError("The edit distance of two reads in the input list must equal to one!")
+                position = int(diff.argmax())
                 first = read1[position]
                 second = read2[position]
                 if position == 0:
@@ -110,16 +443,11 @@ class DataGneration():
                     s_kmer = read2[position-1 : position+2]  
 
             elif f_len < s_len:
-                position = -1
-                num = 0
-                for index in range(f_len):
-                    if read1[index] == read2[index]:
-                        num = num + 1
-                    else:
-                        position = index
-                        break
-                if num == f_len:
-                    position = f_len
+                # the inserted base sits at the first mismatching prefix
+                # position, or at the end when the shorter read is a prefix
+                diff = np.frombuffer(read1.encode(), np.uint8) ^ np.frombuffer(read2.encode(), np.uint8)[:f_len]
+                nz = np.flatnonzero(diff)
+                position = int(nz[0]) if nz.size else f_len
                 first = 'X'
                 second = read2[position]  
                 if position == 0:
@@ -132,16 +460,9 @@ class DataGneration():
                     f_kmer = read1[position-1] + 'X' + read1[position]
                     s_kmer = read2[position-1 : position+2]                    
             elif f_len > s_len:
-                position = -1
-                num = 0
-                for index in range(s_len):
-                    if read1[index] == read2[index]:
-                        num = num + 1
-                    else:
-                        position = index
-                        break
-                if num == s_len:
-                    position = s_len
+                diff = np.frombuffer(read1.encode(), np.uint8)[:s_len] ^ np.frombuffer(read2.encode(), np.uint8)
+                nz = np.flatnonzero(diff)
+                position = int(nz[0]) if nz.size else s_len
                 first = read1[position]
                 second = 'X'
                 if position == 0:
@@ -160,23 +481,18 @@ class DataGneration():
         #gc.collect()
         return new_line_list
 
-    def real_ed1_seqs(self, total_seqs, read):
+    def real_ed1_seqs(self, seq_ids, read):
         """
-        given a read, generate all its 1nt-edit-distance read counterparts existing in the dataset to form the edges  
+        given a read, generate all its 1nt-edit-distance read counterparts existing in the dataset to form the edges
 
         Args:
-            total_seqs (list): The list consisting of all reads in the sequencing dataset.
+            seq_ids (dict): Mapping from every encoded unique read to its integer id.
             read (str): A DNA/RNA sequence.
 
         Returns:
-            list: list of tuples of read pairs with only one base different
+            list: list of integer id pairs of reads with only one base different
         """
-        possible_ed1 = enumerate_ed1_seqs(read)
-        real_seqs =  total_seqs.intersection(possible_ed1)
-        read_lst = [read] * len(real_seqs)
-        edges = list(zip(read_lst, real_seqs))
-        # del possible_ed1, read_lst, real_seqs
-        return edges
+        return _real_ed1_seqs(seq_ids, read)
 
     # def read2seqs_nt(self, high_freq_reads, edit_dis):
     #     try:
@@ -251,76 +567,31 @@ class DataGneration():
         """
         graph, seqs_lens_lst, seqs2id_dict, unique_seqs = self.generate_graph(input_file, edit_dis=1)
         del seqs_lens_lst, seqs2id_dict, unique_seqs
-        subgraphs = [graph.subgraph(c).copy() for c in nx.connected_components(graph) if len(c) >= 2 ]#
-        # print(len(subgraphs))
+        # flatten counts, degrees and adjacency into CSR arrays once so the
+        # workers index numpy arrays instead of networkx attribute dicts
+        nodes, id_of, indptr, indices, counts = _graph_to_csr(graph)
+        components = [np.fromiter((id_of[n] for n in c), dtype=np.int64, count=len(c)) for c in nx.connected_components(graph) if len(c) >= 2]
+        del id_of, graph
         genuine_lst = []
-        chunk_size = len(subgraphs) // self.config.chunks_num
-        if chunk_size > 1:
-        # if chunk_size >= self.config.num_workers:
-            groups = [subgraphs[i:i+chunk_size] for i in range(0, len(subgraphs), chunk_size)]
-
-            # Write each group of subgraphs to separate files
-            gexf_files = []
-            # print(len(groups))
-            for i, group in enumerate(groups):
-                # Create a new graph for the group of subgraphs
-                group_G = nx.Graph()
-                # print(group)
-                for subgraph_nodes in group:
-                    # print(subgraph_nodes)
-                    group_G.add_edges_from(graph.subgraph(subgraph_nodes).edges())
-                    # Add node attributes to the new graph
-                    for node in subgraph_nodes:
-                        # print(node)
-                        group_G.nodes[node].update(graph.nodes[node])
-                # Generate the file name for the group
-                file_name = self.config.result_dir + f"group_{i}.gexf"
-
-                # Write the group of subgraphs to the file
-                nx.write_gexf(group_G, file_name)
-                gexf_files.append(file_name)
-            del groups, subgraphs, graph
-
-            for gexf_file in gexf_files:
-                cur_graph = nx.read_gexf(gexf_file)
-                sub_graphs = [cur_graph.subgraph(c).copy() for c in nx.connected_components(cur_graph)]
-                
-                subgraph_num = len(sub_graphs)
-                try:
-                    with WorkerPool(self.config.num_workers, shared_objects=sub_graphs, start_method='fork') as pool:
-                        cur_genuine_lsts = pool.imap(self.extract_umi_genuine_errs_subgraph, range(subgraph_num))
-                    #gc.collect()
-                except KeyboardInterrupt:
-                    # Handle termination signal (Ctrl+C)
-                    pool.terminate()  # Terminate the WorkerPool before exiting
-                except Exception:
-                    # Handle other exceptions
-                    pool.terminate()  # Terminate the WorkerPool before exiting
-                    raise  
-                for item in cur_genuine_lsts:
-                    genuine_lst.extend(item)
-
-                os.remove(gexf_file)
-                del cur_graph, sub_graphs
-        else:
-            subgraph_num = len(subgraphs)
-            try:
-                with WorkerPool(self.config.num_workers, shared_objects=subgraphs, start_method='fork') as pool:
-                    cur_genuine_lsts = pool.imap(self.extract_umi_genuine_errs_subgraph, range(subgraph_num))
-                #gc.collect()
-            except KeyboardInterrupt:
-                # Handle termination signal (Ctrl+C)
-                pool.terminate()  # Terminate the WorkerPool before exiting
-            except Exception:
-                # Handle other exceptions
-                pool.terminate()  # Terminate the WorkerPool before exiting
-                raise
-            del subgraphs, graph
+        component_num = len(components)
+        try:
+            shared_obs = nodes, indptr, indices, counts, components
+            with WorkerPool(self.config.num_workers, shared_objects=shared_obs, start_method='fork') as pool:
+                cur_genuine_lsts = pool.imap(self.extract_umi_genuine_errs_subgraph, range(component_num))
+            del shared_obs
+            #gc.collect()
+        except KeyboardInterrupt:
+            # Handle termination signal (Ctrl+C)
+            pool.terminate()  # Terminate the WorkerPool before exiting
+        except Exception:
+            # Handle other exceptions
+            pool.terminate()  # Terminate the WorkerPool before exiting
+            raise
+        del components
 
-            for item in cur_genuine_lsts:
-                genuine_lst.extend(item)
+        for item in cur_genuine_lsts:
+            genuine_lst.extend(item)
 
-            
         genuine_df = pd.DataFrame(genuine_lst, columns=["StartRead","StartReadCount", "StartDegree", "ErrorTye","ErrorPosition", "StartErrKmer", "EndErrKmer", "EndRead", "EndReadCount", "EndDegree"])
 
         if self.config.verbose:
@@ -329,35 +600,38 @@ class DataGneration():
         #gc.collect()
         return genuine_df
 
-    def extract_umi_genuine_errs_subgraph(self, sub_graphs, i): 
+    def extract_umi_genuine_errs_subgraph(self, shared_obs, i): 
         gen_lst = []
-        sub_graph = sub_graphs[i]
-        nodes_lst = list(sub_graph.nodes)
-        for node in nodes_lst:
-            node_count = sub_graph.nodes[node]['count']
-            node_degree = sub_graph.degree[node]
+        nodes, indptr, indices, counts, components = shared_obs
+        # the visit flags never need to outlive one component, so track them
+        # locally instead of mutating node attributes on the shared graph
+        visited = set()
+        for a in components[i]:
+            node_count = counts[a]
+            node_degree = indptr[a + 1] - indptr[a]
             line = []
-            if node_degree >= 1 and node_count <= self.config.max_error_freq and not sub_graph.nodes[node]['flag']: #and node_degree <= 4
-                node_neis = [n for n in sub_graph.neighbors(node)]
-                # nei2count = []
-                nei_degree_count = []
-                for nei in node_neis:
-                    nei_count = sub_graph.nodes[nei]['count']
-                    nei_degree = sub_graph.degree[nei]
-                    # nei2count.append((nei, nei_count))
+            if node_degree >= 1 and node_count <= self.config.max_error_freq and a not in visited: #and node_degree <= 4
+                # pick the best-scoring neighbour in one pass; a strict
+                # comparison keeps the first maximum, like the stable sort did
+                first_nei = -1
+                best_tt = -1.0
+                first_nei_count = 0
+                for k in range(indptr[a], indptr[a + 1]):
+                    nei = indices[k]
+                    nei_count = counts[nei]
+                    nei_degree = indptr[nei + 1] - indptr[nei]
                     tt = nei_degree * 0.5 + nei_count * 0.5
-                    nei_degree_count.append((nei, tt, nei_count))
-                # nei2count.sort(key=lambda x:x[1], reverse=True)
-                nei_degree_count.sort(key=lambda x:x[1], reverse=True)
-                # first_nei, first_nei_count = nei2count[0]
-                first_nei, tt, first_nei_count = nei_degree_count[0]
-                first_nei_degree = sub_graph.degree[first_nei]
+                    if tt > best_tt:
+                        best_tt = tt
+                        first_nei = nei
+                        first_nei_count = nei_count
+                first_nei_degree = indptr[first_nei + 1] - indptr[first_nei]
                 if first_nei_count > self.config.high_freq_thre:
-                    line = [first_nei, first_nei_count, first_nei_degree, node, node_count, node_degree]
+                    line = [nodes[first_nei], first_nei_count, first_nei_degree, nodes[a], node_count, node_degree]
                     newline = self.err_type_classification(line)
                     # genuine_df.loc[len(genuine_df)] = newline
                     gen_lst.append(newline)
-                sub_graph.nodes[node]['flag'] = True
+                visited.add(a)
             else:
                 continue   
         #gc.collect()
@@ -495,114 +769,58 @@ class DataGneration():
         """
         if edit_dis == 1:
             genu_columns = ["StartRead","StartReadCount", "StartDegree", "ErrorTye","ErrorPosition", "StartErrKmer", "EndErrKmer", "EndRead", "EndReadCount", "EndDegree"]
-            ambiguous_df= pd.DataFrame(columns=["idx", "StartRead","StartReadCount", "StartDegree", "ErrorTye","ErrorPosition", "StartErrKmer", "EndErrKmer", "EndRead", "EndReadCount", "EndDegree"])
+            ambi_columns = ["idx", "StartRead","StartReadCount", "StartDegree", "ErrorTye","ErrorPosition", "StartErrKmer", "EndErrKmer", "EndRead", "EndReadCount", "EndDegree"]
             genuine_csv = self.config.result_dir + "genuine1.csv"
             ambiguous_csv = self.config.result_dir + "ambiguous1.csv"
         elif edit_dis == 2: #or edit_dis == 3:
             genu_columns = ["StartRead","StartReadCount", "StartDegree", "EndRead", "EndReadCount", "EndDegree"]
-            ambiguous_df= pd.DataFrame(columns=["idx", "StartRead", "StartReadCount", "StartDegree", "EndRead", "EndReadCount", "EndDegree"])
+            ambi_columns = ["idx", "StartRead", "StartReadCount", "StartDegree", "EndRead", "EndReadCount", "EndDegree"]
             genuine_csv = self.config.result_dir + "genuine2.csv"
             ambiguous_csv = self.config.result_dir + "ambiguous2.csv"  
 
-        subgraphs = [graph.subgraph(c).copy() for c in nx.connected_components(graph) if len(c) >= 2 ]#
-        # subgraphs = [graph.subgraph(c).copy() for c in nx.connected_components(graph)]
+        # flatten the graph to CSR adjacency so the workers index compact
+        # numpy arrays instead of chasing per-node attribute dicts
+        nodes, id_of, indptr, indices, counts = _graph_to_csr(graph)
+        components = [np.fromiter((id_of[n] for n in c), dtype=np.int64, count=len(c))
+                      for c in nx.connected_components(graph) if len(c) >= 2]
 
         self.logger.info("Extracting genuine and ambiguous errors...")
         genuine_lst = []
         ambiguous_lst = []
 
         if self.config.high_ambiguous:
-            high_ambiguous_df = pd.DataFrame(columns=["idx", "StartRead", "StartReadCount", "StartDegree", "ErrorTye","ErrorPosition", "StartErrKmer", "EndErrKmer", "EndRead", "EndReadCount", "EndDegree"])    
+            high_ambi_columns = ["idx", "StartRead", "StartReadCount", "StartDegree", "ErrorTye","ErrorPosition", "StartErrKmer", "EndErrKmer", "EndRead", "EndReadCount", "EndDegree"]
             high_ambi_lst = []  
             high_idx = 0
 
-        chunk_size = len(subgraphs) // self.config.chunks_num
-        # chunk_size = self.config.num_workers
-        # chunk_num = len(subgraphs) // chunk_size
-        self.logger.debug(chunk_size)
-        if chunk_size > 1:
-        # if chunk_size >= self.config.num_workers:
-        # if chunk_num > 1:
-        # if False:
-            groups = [subgraphs[i:i+chunk_size] for i in range(0, len(subgraphs), chunk_size)]
-            # self.logger.debug(groups)
-            # Write each group of subgraphs to separate files
-            gexf_files = []
-            for i, group in enumerate(groups):
-                # self.logger.debug(group)
-                # Create a new graph for the group of subgraphs
-                group_G = nx.Graph()
-                for subgraph_nodes in group:
-                    group_G.add_edges_from(graph.subgraph(subgraph_nodes).edges())
-                    # Add node attributes to the new graph
-
-                    for node in subgraph_nodes:
-                        # self.logger.debug(node)
-                        group_G.nodes[node].update(graph.nodes[node])
-                # Generate the file name for the group
-                file_name = self.config.result_dir + f"group_{i}.gexf"
-                # Write the group of subgraphs to the file
-                nx.write_gexf(group_G, file_name)
-                gexf_files.append(file_name)
-            del groups, subgraphs, graph
-
-            for gexf_file in gexf_files:
-                cur_graph = nx.read_gexf(gexf_file)
-                sub_graphs = [cur_graph.subgraph(c).copy() for c in nx.connected_components(cur_graph)]
-                subgraph_num = len(sub_graphs)
-                try:
-                    shared_obs = sub_graphs, edit_dis
-                    with WorkerPool(self.config.num_workers, shared_objects=shared_obs, start_method='fork') as pool:
-                        for genu_ambi_lst in pool.imap(self.extract_genuine_ambi_errs_subgraph, range(subgraph_num)): # progress_bar=self.config.verbose
-                            if genu_ambi_lst[0]:
-                                genuine_lst.extend(genu_ambi_lst[0])
-                                ambiguous_lst.extend(genu_ambi_lst[1])
-                    del shared_obs
-                    #gc.collect()
-                except KeyboardInterrupt:
-                    # Handle termination signal (Ctrl+C)
-                    pool.terminate()  # Terminate the WorkerPool before exiting
-                except Exception:
-                    # Handle other exceptions
-                    pool.terminate()  # Terminate the WorkerPool before exiting
-                    raise
-
-                if self.config.high_ambiguous:
-                    # cur_lst, cur_idx = self.extract_high_ambiguous_errs(sub_graphs, high_idx)
-                    try:
-                        with WorkerPool(self.config.num_workers, shared_objects=sub_graphs, start_method='fork') as pool:
-                            for high_ambi_pair_lst in pool.imap(self.extract_high_ambiguous_errs, range(subgraph_num)): # progress_bar=self.config.verbose
-                                for (a2b, b2a) in high_ambi_pair_lst:
-                                    a2b.insert(0, high_idx)
-                                    b2a.insert(0, high_idx)
-                                    high_idx += 1
-                                    high_ambi_lst.append(a2b)
-                                    high_ambi_lst.append(b2a)
-                        #gc.collect() 
-                    except KeyboardInterrupt:
-                        # Handle termination signal (Ctrl+C)
-                        pool.terminate()  # Terminate the WorkerPool before exiting
-                    except Exception:
-                        # Handle other exceptions
-                        pool.terminate()  # Terminate the WorkerPool before exiting
-                        raise
-                       
-                    # high_ambi_lst.extend(cur_lst)
-                    # high_idx = cur_idx + 1
-
-                
-                os.remove(gexf_file)
-                del cur_graph, sub_graphs
-        else: 
-            subgraph_num = len(subgraphs)
-              
+        component_num = len(components)
+        try:
+            shared_obs = nodes, indptr, indices, counts, components, edit_dis
+            with WorkerPool(self.config.num_workers, shared_objects=shared_obs, start_method='fork') as pool:
+                for genu_ambi_lst in pool.imap(self.extract_genuine_ambi_errs_subgraph, range(component_num)): # progress_bar=self.config.verbose
+                    if genu_ambi_lst[0]:
+                        genuine_lst.extend(genu_ambi_lst[0])
+                        ambiguous_lst.extend(genu_ambi_lst[1])
+            del shared_obs
+            #gc.collect()
+        except KeyboardInterrupt:
+            # Handle termination signal (Ctrl+C)
+            pool.terminate()  # Terminate the WorkerPool before exiting
+        except Exception:
+            # Handle other exceptions
+            pool.terminate()  # Terminate the WorkerPool before exiting
+            raise
+        if self.config.high_ambiguous:
             try:
-                shared_obs = subgraphs, edit_dis 
+                shared_obs = nodes, indptr, indices, counts, components
                 with WorkerPool(self.config.num_workers, shared_objects=shared_obs, start_method='fork') as pool:
-                    for genu_ambi_lst in pool.imap(self.extract_genuine_ambi_errs_subgraph, range(subgraph_num)): # progress_bar=self.config.verbose
-                        if genu_ambi_lst[0]:
-                            genuine_lst.extend(genu_ambi_lst[0])
-                            ambiguous_lst.extend(genu_ambi_lst[1])
+                    for high_ambi_pair_lst in pool.imap(self.extract_high_ambiguous_errs, range(component_num)): # progress_bar=self.config.verbose
+                        for (a2b, b2a) in high_ambi_pair_lst:
+                            # prepend by concatenation; insert(0, ...) shifts
+                            # the whole row per call
+                            high_ambi_lst.append([high_idx] + a2b)
+                            high_ambi_lst.append([high_idx] + b2a)
+                            high_idx += 1
                 del shared_obs
                 #gc.collect()
             except KeyboardInterrupt:
@@ -612,42 +830,34 @@ class DataGneration():
                 # Handle other exceptions
                 pool.terminate()  # Terminate the WorkerPool before exiting
                 raise
-            if self.config.high_ambiguous:
-                # cur_lst, cur_idx = self.extract_high_ambiguous_errs(subgraphs, high_idx)
-                # high_ambi_lst.extend(cur_lst)
-                # high_idx = cur_idx + 1
-                try:
-                    with WorkerPool(self.config.num_workers, shared_objects=subgraphs, start_method='fork') as pool:
-                        for high_ambi_pair_lst in pool.imap(self.extract_high_ambiguous_errs, range(subgraph_num)): # progress_bar=self.config.verbose
-                            for (a2b, b2a) in high_ambi_pair_lst:
-                                a2b.insert(0, high_idx)
-                                b2a.insert(0, high_idx)
-                                high_idx += 1
-                                high_ambi_lst.append(a2b)
-                                high_ambi_lst.append(b2a)
-                    #gc.collect()
-                except KeyboardInterrupt:
-                    # Handle termination signal (Ctrl+C)
-                    pool.terminate()  # Terminate the WorkerPool before exiting
-                except Exception:
-                    # Handle other exceptions
-                    pool.terminate()  # Terminate the WorkerPool before exiting
-                    raise
-                
-            del subgraphs, graph
+
+        del components, graph
 
         genuine_df = pd.DataFrame(genuine_lst, columns=genu_columns)
 
-        idx = 0
-        for a_item in ambiguous_lst:
+        # assemble the rows in plain lists and build each DataFrame once;
+        # per-row .loc[len(df)] appends are quadratic in the row count
+        ambi_rows = []
+        for idx, a_item in enumerate(ambiguous_lst):
             for sub_item in a_item:
-                sub_item.insert(0, idx)
-                ambiguous_df.loc[len(ambiguous_df)] = sub_item
-            idx += 1
+                ambi_rows.append([idx] + sub_item)
+        ambiguous_df = pd.DataFrame(ambi_rows, columns=ambi_columns)
 
         if self.config.high_ambiguous: 
-            for item in high_ambi_lst:
-                high_ambiguous_df.loc[len(high_ambiguous_df)] = item
+            # assemble column-wise with typed arrays; building from row lists
+            # makes pandas re-infer every column from Python objects
+            row_num = len(high_ambi_lst)
+            int_cols = {"idx", "StartReadCount", "StartDegree", "ErrorPosition", "EndReadCount", "EndDegree"}
+            high_cols = {}
+            for j, col in enumerate(high_ambi_columns):
+                if col in int_cols:
+                    high_cols[col] = np.fromiter((row[j] for row in high_ambi_lst), dtype=np.int64, count=row_num)
+                else:
+                    col_arr = np.empty(row_num, dtype=object)
+                    for r, row in enumerate(high_ambi_lst):
+                        col_arr[r] = row[j]
+                    high_cols[col] = col_arr
+            high_ambiguous_df = pd.DataFrame(high_cols, columns=high_ambi_columns)
             
         if self.config.verbose:
             genuine_df.to_csv(genuine_csv, index=False)  
@@ -675,104 +885,49 @@ class DataGneration():
         """
         if edit_dis == 1:
             genu_columns = ["StartRead","StartReadCount", "StartDegree", "ErrorTye","ErrorPosition", "StartErrKmer", "EndErrKmer", "EndRead", "EndReadCount", "EndDegree"]
-            ambiguous_df= pd.DataFrame(columns=["idx", "StartRead","StartReadCount", "StartDegree", "ErrorTye","ErrorPosition", "StartErrKmer", "EndErrKmer", "EndRead", "EndReadCount", "EndDegree"])
+            ambi_columns = ["idx", "StartRead","StartReadCount", "StartDegree", "ErrorTye","ErrorPosition", "StartErrKmer", "EndErrKmer", "EndRead", "EndReadCount", "EndDegree"]
             genuine_csv = self.config.result_dir + "genuine1.csv"
             ambiguous_csv = self.config.result_dir + "ambiguous1.csv"
         elif edit_dis == 2: #or edit_dis == 3:
             genu_columns = ["StartRead","StartReadCount", "StartDegree", "EndRead", "EndReadCount", "EndDegree"]
-            ambiguous_df= pd.DataFrame(columns=["idx", "StartRead", "StartReadCount", "StartDegree", "EndRead", "EndReadCount", "EndDegree"])
+            ambi_columns = ["idx", "StartRead", "StartReadCount", "StartDegree", "EndRead", "EndReadCount", "EndDegree"]
             genuine_csv = self.config.result_dir + "genuine2.csv"
             ambiguous_csv = self.config.result_dir + "ambiguous2.csv"  
 
-        subgraphs = [graph.subgraph(c).copy() for c in nx.connected_components(graph) if len(c) >= 2 ]#
-        # subgraphs = [graph.subgraph(c).copy() for c in nx.connected_components(graph)]
-        # print("test")
-        # print(len(subgraphs))
-        
+        # flatten the graph to CSR adjacency so the workers index compact
+        # numpy arrays instead of chasing per-node attribute dicts
+        nodes, id_of, indptr, indices, counts = _graph_to_csr(graph)
+        components = [np.fromiter((id_of[n] for n in c), dtype=np.int64, count=len(c))
+                      for c in nx.connected_components(graph) if len(c) >= 2]
+
         self.logger.info("Extracting genuine and ambiguous errors...")
         genuine_lst = []
         ambiguous_lst = []
-        chunk_size = len(subgraphs) // self.config.chunks_num
-        # chunk_size = self.config.num_workers
-        # chunk_num = len(subgraphs) // chunk_size
-        if chunk_size > 1:
-        # if chunk_size >= self.config.num_workers:
-        # if chunk_num > 1:
-        # if False:
-            groups = [subgraphs[i:i+chunk_size] for i in range(0, len(subgraphs), chunk_size)]
-
-            self.logger.debug(len(groups))
-            # Write each group of subgraphs to separate files
-            gexf_files = []
-            for i, group in enumerate(groups):
-                # Create a new graph for the group of subgraphs
-                # self.logger.debug(group)
-                group_G = nx.Graph()
-                for subgraph_nodes in group:
-                    group_G.add_edges_from(graph.subgraph(subgraph_nodes).edges())
-                    # Add node attributes to the new graph
-                    # self.logger.debug(subgraph_nodes)
-                    for node in subgraph_nodes:
-                        # self.logger.debug(node)
-                        group_G.nodes[node].update(graph.nodes[node])
-                # Generate the file name for the group
-                file_name = self.config.result_dir + f"group_{i}.gexf"
-
-                # Write the group of subgraphs to the file
-                nx.write_gexf(group_G, file_name)
-                gexf_files.append(file_name)
-            del groups, subgraphs, graph
-            ####
-            for gexf_file in gexf_files:
-                cur_graph = nx.read_gexf(gexf_file)
-                sub_graphs = [cur_graph.subgraph(c).copy() for c in nx.connected_components(cur_graph)]
-                try:
-                    subgraph_num = len(sub_graphs)
-                    shared_obs = sub_graphs, edit_dis
-                    with WorkerPool(self.config.num_workers, shared_objects=shared_obs, start_method='fork') as pool:
-                        for genu_ambi_lst in pool.imap(self.extract_genuine_ambi_errs_subgraph, range(subgraph_num)): # progress_bar=self.config.verbose
-                            if genu_ambi_lst[0]:
-                                genuine_lst.extend(genu_ambi_lst[0])
-                                ambiguous_lst.extend(genu_ambi_lst[1])
-                    del shared_obs
-                    #gc.collect()
-                    
-                except KeyboardInterrupt:
-                    # Handle termination signal (Ctrl+C)
-                    pool.terminate()  # Terminate the WorkerPool before exiting
-                except Exception:
-                    # Handle other exceptions
-                    pool.terminate()  # Terminate the WorkerPool before exiting
-                    raise
-                os.remove(gexf_file)
-                del cur_graph, sub_graphs
-        else:
-            try:
-                subgraph_num = len(subgraphs)
-                shared_obs = subgraphs, edit_dis
-                with WorkerPool(self.config.num_workers, shared_objects=shared_obs, start_method='fork') as pool:
-                    for genu_ambi_lst in pool.imap(self.extract_genuine_ambi_errs_subgraph, range(subgraph_num)): # progress_bar=self.config.verbose
-                        if genu_ambi_lst[0]:
-                            genuine_lst.extend(genu_ambi_lst[0])
-                            ambiguous_lst.extend(genu_ambi_lst[1])
-                del shared_obs, subgraphs, graph
-                #gc.collect()
-            except KeyboardInterrupt:
-                # Handle termination signal (Ctrl+C)
-                pool.terminate()  # Terminate the WorkerPool before exiting
-            except Exception:
-                # Handle other exceptions
-                pool.terminate()  # Terminate the WorkerPool before exiting
-                raise
+        component_num = len(components)
+        try:
+            shared_obs = nodes, indptr, indices, counts, components, edit_dis
+            with WorkerPool(self.config.num_workers, shared_objects=shared_obs, start_method='fork') as pool:
+                for genu_ambi_lst in pool.imap(self.extract_genuine_ambi_errs_subgraph, range(component_num)): # progress_bar=self.config.verbose
+                    if genu_ambi_lst[0]:
+                        genuine_lst.extend(genu_ambi_lst[0])
+                        ambiguous_lst.extend(genu_ambi_lst[1])
+            del shared_obs, components, graph, nodes, id_of, indptr, indices, counts
+            #gc.collect()
+        except KeyboardInterrupt:
+            # Handle termination signal (Ctrl+C)
+            pool.terminate()  # Terminate the WorkerPool before exiting
+        except Exception:
+            # Handle other exceptions
+            pool.terminate()  # Terminate the WorkerPool before exiting
+            raise
 
         genuine_df = pd.DataFrame(genuine_lst, columns=genu_columns)
 
-        idx = 0
-        for a_item in ambiguous_lst:
+        ambi_rows = []
+        for idx, a_item in enumerate(ambiguous_lst):
             for sub_item in a_item:
-                sub_item.insert(0, idx)
-                ambiguous_df.loc[len(ambiguous_df)] = sub_item
-            idx += 1
+                ambi_rows.append([idx] + sub_item)
+        ambiguous_df = pd.DataFrame(ambi_rows, columns=ambi_columns)
 
         if self.config.verbose:
             genuine_df.to_csv(genuine_csv, index=False)  
@@ -811,12 +966,12 @@ class DataGneration():
         Returns:
             DataFrame: pd dataframe saving one sample one row
         """
-        tmp_df = pd.DataFrame()
+        rows = []
         for a_item in item_lst:
             for sub_item in a_item:
-                sub_item.insert(0, idx)
-                tmp_df.loc[len(tmp_df)] = sub_item
+                rows.append([idx] + sub_item)
             idx += 1
+        tmp_df = pd.DataFrame(rows)
         #gc.collect()
         return tmp_df
 
@@ -1002,13 +1157,13 @@ class DataGneration():
             negative_csv = self.config.result_dir + "negative1.csv"
         elif edit_dis == 2:   
             negative_csv = self.config.result_dir + "negative2.csv"  
-        negative_df = pd.DataFrame(columns=["StartRead","StartReadCount", "StartDegree"])
+        negative_rows = []
         for k in isolates:
             k_count = graph.nodes[k]['count']
             if k_count > self.config.high_freq_thre:
                 k_degree = graph.degree[k]
-                line = [k, k_count, k_degree]
-                negative_df.loc[len(negative_df)] = line  
+                negative_rows.append([k, k_count, k_degree])
+        negative_df = pd.DataFrame(negative_rows, columns=["StartRead","StartReadCount", "StartDegree"])
 
         if self.config.verbose:
             negative_df.to_csv(negative_csv, index=False) 
@@ -1037,15 +1192,11 @@ class DataGneration():
 
         self.logger.debug("Isolated Nodes Number: {}".format(len(isolates)))
 
-        name_lst = []
-        non_name_lst = []
         nonisolated_seqs = unique_seqs - isolates 
-        # save isolated nodes as negative samples
-        for k in isolates:
-            name_lst.extend(seqs2id_dict[k])                  
-                
-        for s in nonisolated_seqs:
-            non_name_lst.extend(seqs2id_dict[s])
+        # save isolated nodes as negative samples; flatten the id lists in C
+        # via chain instead of extending per read
+        name_lst = list(chain.from_iterable(seqs2id_dict[k] for k in isolates))
+        non_name_lst = list(chain.from_iterable(seqs2id_dict[s] for s in nonisolated_seqs))
 
         self.logger.debug("isolates name list: {}".format(len(name_lst)))
         self.logger.debug("non-isolates name list: {}".format(len(non_name_lst)))
@@ -1054,26 +1205,16 @@ class DataGneration():
         bases = input_data.split('/')[-1]
         base = bases.split('.')
 
-        file_type = parse_file_type(input_data)
+        out_ext = _OUT_EXT[parse_file_type(input_data)]
 
-        if file_type == 'fastq' or file_type == 'fq' or file_type == 'fastq.gz' or file_type == 'fq.gz':
-            if self.config.correcting_umi:
-                isolates_sufix = '_umi_isolates.fastq'
-                non_isolates_sufix = '_umi_non_isolates.fastq'
-            else:
-                isolates_sufix = '_read_isolates.fastq'
-                non_isolates_sufix = '_read_non_isolates.fastq'
-            isolates_file = self.config.result_dir + base[0] + isolates_sufix
-            non_isolates_file = self.config.result_dir + base[0] + non_isolates_sufix
-        elif file_type == 'fasta' or file_type == 'fa' or file_type == 'fasta.gz' or file_type == 'fas.gz':
-            if self.config.correcting_umi:
-                isolates_sufix = '_umi_isolates.fasta'
-                non_isolates_sufix = '_umi_non_isolates.fasta'
-            else:
-                isolates_sufix = '_read_isolates.fasta'
-                non_isolates_sufix = '_read_non_isolates.fasta'
-            isolates_file = self.config.result_dir + base[0] + isolates_sufix
-            non_isolates_file = self.config.result_dir + base[0] + non_isolates_sufix 
+        if self.config.correcting_umi:
+            isolates_sufix = '_umi_isolates.' + out_ext
+            non_isolates_sufix = '_umi_non_isolates.' + out_ext
+        else:
+            isolates_sufix = '_read_isolates.' + out_ext
+            non_isolates_sufix = '_read_non_isolates.' + out_ext
+        isolates_file = self.config.result_dir + base[0] + isolates_sufix
+        non_isolates_file = self.config.result_dir + base[0] + non_isolates_sufix
 
         extract_records(self.config.result_dir, name_lst, input_data, isolates_file)
         extract_records(self.config.result_dir, non_name_lst, input_data, non_isolates_file)
@@ -1100,30 +1241,50 @@ class DataGneration():
         self.logger.info("Input dataset '% s'" % data_set)
         record_iterator, file_type = parse_data(data_set)
         seqs2id_dict = {}
-        total_seqs = []
+        read_count = {}
         seq_lens_set = set()
-        for item in record_iterator:
-            seq = str(item.seq)
-            ll = len(seq)
-            seq_lens_set.add(ll)
-            total_seqs.append(seq)
-            seqs2id_dict.setdefault(seq, []).append(str(item.id))
-        unique_seqs = set(total_seqs)
+        # decode records on a producer thread so file reading (and gzip
+        # decompression) overlaps with the counting pass below; counting
+        # happens while parsing instead of keeping every read in a total_seqs
+        # list just to feed Counter a second full pass
+        records_q = queue.Queue(maxsize=10000)
+        def _produce():
+            # a parse error (e.g. a truncated fastq) must reach the consumer,
+            # and the sentinel must go out even then or the main thread would
+            # block on the queue forever
+            try:
+                for item in record_iterator:
+                    records_q.put((str(item.seq), str(item.id)))
+            except Exception as exc:
+                records_q.put(exc)
+            finally:
+                records_q.put(None)
+        producer = threading.Thread(target=_produce, daemon=True)
+        producer.start()
+        while True:
+            rec = records_q.get()
+            if rec is None:
+                break
+            if isinstance(rec, Exception):
+                producer.join()
+                raise rec
+            seq, rec_id = rec
+            seq_lens_set.add(len(seq))
+            read_count[seq] = read_count.get(seq, 0) + 1
+            seqs2id_dict.setdefault(seq, []).append(rec_id)
+        producer.join()
+        unique_seqs = set(read_count)
 
         self.logger.info("Constructing " + str(edit_dis) + "nt-edit-distance read graph...")
         graph = nx.Graph()
-        read_count = Counter(total_seqs)
-        high_freq = []
-        low_freq = []
-
-        for read, frequency in read_count.items():
-            if not graph.has_node(read):
-                graph.add_node(read, count = frequency, flag=False)  
-            # if frequency >= self.config.high_freq_thre:
-            if frequency > self.config.high_freq_thre:
-                high_freq.append(read)
-            else:
-                low_freq.append(read)
+        # read_count keys are already unique, so the old per-read has_node
+        # check never fired; add all nodes in one call and partition the
+        # reads with comprehensions instead of a per-item Python branch
+        graph.add_nodes_from((read, {'count': frequency}) for read, frequency in read_count.items())
+        thre = self.config.high_freq_thre
+        # high_freq = [read for read, frequency in read_count.items() if frequency >= thre]
+        high_freq = [read for read, frequency in read_count.items() if frequency > thre]
+        low_freq = [read for read, frequency in read_count.items() if frequency <= thre]
         highseq_num = len(high_freq)
         if highseq_num == 0:
             self.logger.error("Error Correction Failed as no high-frequency reads detected.")
@@ -1133,56 +1294,73 @@ class DataGneration():
         ######################################################
         edges_lst = []
         if edit_dis == 1:
-            shared_unique_seqs = unique_seqs
+            # index the encoded reads by integer id; the workers probe a
+            # bytes-keyed dict and hand back compact integer edge pairs
+            seq_ids = {}
+            for seq in unique_seqs:
+                seq_ids[seq.encode()] = len(seq_ids)
+            id2seq = [None] * len(seq_ids)
+            for raw, i in seq_ids.items():
+                id2seq[i] = raw.decode()
+            shared_unique_seqs = seq_ids
         elif edit_dis == 2:
-            shared_unique_seqs = low_freq
-        
+            # group the low-frequency reads by length and encode each group as
+            # a contiguous uint8 matrix for the compiled scan
+            low_by_len = {}
+            for seq in low_freq:
+                low_by_len.setdefault(len(seq), []).append(seq)
+            shared_unique_seqs = {}
+            for length, seqs in low_by_len.items():
+                byte_mat = np.frombuffer("".join(seqs).encode(), np.uint8).reshape(len(seqs), length)
+                isacgt = (byte_mat == 65) | (byte_mat == 67) | (byte_mat == 71) | (byte_mat == 84)
+                pure = isacgt.all(axis=1)
+                pure_ids = np.flatnonzero(pure)
+                other_ids = np.flatnonzero(~pure)
+                # 2-bit packing only represents ACGT; rows with other
+                # characters stay on the byte-scan path
+                if len(pure_ids) > 0:
+                    words_mat = _pack_reads_2bit(np.ascontiguousarray(byte_mat[pure_ids]))
+                else:
+                    words_mat = np.zeros((0, (length + 31) // 32), np.uint64)
+                other_mat = np.ascontiguousarray(byte_mat[other_ids])
+                shared_unique_seqs[length] = (words_mat, pure_ids, other_mat, other_ids, byte_mat, seqs)
+
         self.logger.debug("Searching edges for constructing " + str(edit_dis) + "nt-edit-distance read graph...")
         #############################################################################################################
-        if self.config.reads_chunks_num == 1:
-            try:
-                with WorkerPool(self.config.num_workers, shared_objects=shared_unique_seqs, start_method='fork') as pool:
-                    if edit_dis == 1:
-                        for edge_lst in pool.imap(self.real_ed1_seqs, high_freq): #, worker_lifespan=1, chunk_size=1
-                            edges_lst.extend(edge_lst)
-                    elif edit_dis == 2:
-                        for edge_lst in pool.imap(self.real_ed2_seqs, high_freq):
-                            edges_lst.extend(edge_lst)
-                # #gc.collect()
-            except KeyboardInterrupt:
-                # Handle termination signal (Ctrl+C)
-                pool.terminate()  # Terminate the WorkerPool before exiting
-            except Exception:
-                # Handle other exceptions
-                pool.terminate()  # Terminate the WorkerPool before exiting
-                raise
-        # if chunk_size > 1:
-        else:
-            chunk_size = len(high_freq) // self.config.reads_chunks_num
-            groups = [high_freq[i:i+chunk_size] for i in range(0, len(high_freq), chunk_size)]
-            for group in groups:
-                try:
-                    with WorkerPool(self.config.num_workers, shared_objects=shared_unique_seqs, start_method='fork') as pool: #, start_method='fork'
-                        if edit_dis == 1:
-                            for edge_lst in pool.imap(self.real_ed1_seqs, group): #, progress_bar=self.config.verbose, worker_lifespan=1, chunk_size=1
-                                edges_lst.extend(edge_lst)
-                        elif edit_dis == 2:
-                            for edge_lst in pool.imap(self.real_ed2_seqs, group):
-                                edges_lst.extend(edge_lst)
-                    # #gc.collect()
-                except KeyboardInterrupt:
-                    # Handle termination signal (Ctrl+C)
-                    pool.terminate()  # Terminate the WorkerPool before exiting
-                except Exception:
-                    # Handle other exceptions
-                    pool.terminate()  # Terminate the WorkerPool before exiting
-                    raise               
+        # dispatch contiguous chunks of reads so the per-task overhead is
+        # amortised over many neighbour expansions instead of one imap task
+        # per read; the read index and the chunk list ride along as forked
+        # shared objects so only the tiny chunk indices are pickled
+        chunk_size = max(1, len(high_freq) // (self.config.num_workers * 4))
+        groups = [high_freq[i:i + chunk_size] for i in range(0, len(high_freq), chunk_size)]
+        try:
+            shared_obs = shared_unique_seqs, groups
+            with WorkerPool(self.config.num_workers, shared_objects=shared_obs, start_method='fork') as pool:
+                if edit_dis == 1:
+                    chunk_results = pool.map(_ed1_edges_for_chunk, range(len(groups)))
+                elif edit_dis == 2:
+                    chunk_results = pool.map(_ed2_edges_for_chunk, range(len(groups)))
+            del shared_obs
+        except KeyboardInterrupt:
+            # Handle termination signal (Ctrl+C)
+            pool.terminate()  # Terminate the WorkerPool before exiting
+        except Exception:
+            # Handle other exceptions
+            pool.terminate()  # Terminate the WorkerPool before exiting
+            raise
+        for edge_lst in chunk_results:
+            edges_lst.extend(edge_lst)
+        del groups, chunk_results
 
         ######################################################################################################
         if len(edges_lst) > 0:
             self.logger.debug(len(edges_lst))
             self.logger.debug(edges_lst[0])
-            graph.add_edges_from(edges_lst)
+            if edit_dis == 1:
+                # decode the integer edge pairs back to read strings once
+                graph.add_edges_from((id2seq[u], id2seq[v]) for u, v in edges_lst)
+            else:
+                graph.add_edges_from(edges_lst)
         # self.logger.info(str(edit_dis) + "nt-edit-distance read graph construction done.")
         self.logger.info("Done!")
         ########################################################
@@ -1210,29 +1388,19 @@ class DataGneration():
         else:
             return graph, unique_seqs
 
-    def real_ed2_seqs(self, low_seqs, read):
+    def real_ed2_seqs(self, low_by_len, read):
         """
         given a read, generate all its 2nt-edit-distance substitution counterparts existing in the dataset to form the edges
 
         Args:
-            low_seqs (list): The list consisting of all reads with low-frequency in the sequencing dataset.
+            low_by_len (dict): Low-frequency reads grouped by length, each entry an
+                encoded uint8 matrix paired with the read list in row order.
             read (str): A DNA/RNA sequence.
 
         Returns:
             list: list of tuples of read pairs with two bases different
         """
-        # possible_ed2 = set(self.ed2_seqs(read))
-        possible_ed2 = enumerate_ed2_seqs(read)
-        real_ed2_seqs = possible_ed2.intersection(low_seqs)
-        # del possible_ed2
-        # real_ed2_seqs = []
-        # for seq in possible_ed2:
-        #     if seq in low_seqs:
-        #         real_ed2_seqs.append(seq)
-        read_lst = [read] * len(real_ed2_seqs)
-        edges = list(zip(read_lst, real_ed2_seqs))  
-        # del real_ed2_seqs   
-        return edges   
+        return _real_ed2_seqs(low_by_len, read)
     
     def extract_ed2_errors(self, data_set): 
         """
@@ -1277,95 +1445,101 @@ class DataGneration():
         self.graph_summary(graph)
         #self.MM.measure()
         del seq_lens_set, seqs2id_dict, unique_seqs
-        subgraphs = [graph.subgraph(c).copy() for c in nx.connected_components(graph) if len(c) >= 2]
-        
-        amplicon_df = pd.DataFrame(columns=["idx", "StartRead","StartReadCount", "StartDegree", "ErrorTye", "ErrorPosition", "StartErrKmer", "EndErrKmer", "EndRead", "EndReadCount", "EndDegree"])
-        for sub_graph in subgraphs:
-            edges_lst = [e for e in sub_graph.edges()]
-            if len(edges_lst) > 0:
-                nodes_lst = list(sub_graph.nodes)
-                for node in nodes_lst:
-                    # reset node visit status
-                    sub_graph.nodes[node]['flag'] = False
+        # label components over CSR adjacency in C instead of copying one
+        # networkx subgraph per component and spilling groups to gexf files
+        nodes, id_of, indptr, indices, counts = _graph_to_csr(graph)
+        # singleton components (the bulk of a sparse read graph) are dropped
+        # on the size array before any per-component slice is made
+        components = _csr_components(indptr, indices, min_size=2)
+        del id_of, graph
 
-        chunk_size = len(subgraphs) // self.config.chunks_num
-        idx = 0
-        amplicon_lst = []
+        amplicon_columns = ["idx", "StartRead","StartReadCount", "StartDegree", "ErrorTye", "ErrorPosition", "StartErrKmer", "EndErrKmer", "EndRead", "EndReadCount", "EndDegree"]
 
-        if chunk_size > 1:
-        # if chunk_size >= self.config.num_workers:
-            groups = [subgraphs[i:i+chunk_size] for i in range(0, len(subgraphs), chunk_size)]
-            # Write each group of subgraphs to separate files
-            gexf_files = []
-            for i, group in enumerate(groups):
-                # Create a new graph for the group of subgraphs
-                group_G = nx.Graph()
-                for subgraph_nodes in group:
-                    group_G.add_edges_from(graph.subgraph(subgraph_nodes).edges())
-                    # Add node attributes to the new graph
-                    for node in subgraph_nodes:
-                        group_G.nodes[node].update(graph.nodes[node])
-                # Generate the file name for the group
-                file_name = self.config.result_dir + f"group_{i}.gexf"
-
-                # Write the group of subgraphs to the file
-                nx.write_gexf(group_G, file_name)
-                gexf_files.append(file_name)
-            del groups, subgraphs, graph
-
-            for gexf_file in gexf_files:
-                cur_graph = nx.read_gexf(gexf_file)
-                sub_graphs = [cur_graph.subgraph(c).copy() for c in nx.connected_components(cur_graph)]
-                cur_lst, cur_idx = self.extract_amplicon_errs(sub_graphs, idx)
-                amplicon_lst.extend(cur_lst)
-                idx = cur_idx + 1
-                os.remove(gexf_file)
-                del cur_graph, sub_graphs
-        else:
-            cur_lst, cur_idx = self.extract_amplicon_errs(subgraphs, idx)
-            amplicon_lst.extend(cur_lst)
-            idx = cur_idx + 1   
-            del subgraphs, graph  
+        component_num = len(components)
+        try:
+            shared_obs = nodes, indptr, indices, counts, components
+            with WorkerPool(self.config.num_workers, shared_objects=shared_obs, start_method='fork') as pool:
+                group_lsts = pool.imap(self.extract_amplicon_errs, range(component_num))
+            del shared_obs
+        except KeyboardInterrupt:
+            # Handle termination signal (Ctrl+C)
+            pool.terminate()  # Terminate the WorkerPool before exiting
+        except Exception:
+            # Handle other exceptions
+            pool.terminate()  # Terminate the WorkerPool before exiting
+            raise
 
-        for item in amplicon_lst:
-            amplicon_df.loc[len(amplicon_df)] = item
+        # each group holds the rows of one qualifying low-frequency node; the
+        # global error index is assigned while flattening, and in verbose mode
+        # the csv is streamed out here rather than serialised again from the
+        # finished DataFrame
+        writer = None
         if self.config.verbose:
-            amplicon_df.to_csv(self.config.result_dir + "amplicon.csv", index=False) 
+            csv_handle = open(self.config.result_dir + "amplicon.csv", "w", newline="")
+            writer = csv.writer(csv_handle)
+            writer.writerow(amplicon_columns)
+        idx = 0
+        amplicon_lst = []
+        for groups in group_lsts:
+            for rows in groups:
+                for row in rows:
+                    new_line = [idx] + row
+                    amplicon_lst.append(new_line)
+                    if writer is not None:
+                        writer.writerow(new_line)
+                idx += 1
+        if writer is not None:
+            csv_handle.close()
+        del components
+
+        # build the DataFrame once with explicit dtypes; inferring from the
+        # mixed rows leaves every numeric column as object
+        amplicon_dtypes = {
+            "idx": "int64",
+            "StartRead": "string",
+            "StartReadCount": "int64",
+            "StartDegree": "int32",
+            "ErrorTye": "category",
+            "ErrorPosition": "int16",
+            "StartErrKmer": "string",
+            "EndErrKmer": "string",
+            "EndRead": "string",
+            "EndReadCount": "int64",
+            "EndDegree": "int32",
+        }
+        amplicon_df = pd.DataFrame.from_records(amplicon_lst, columns=amplicon_columns).astype(amplicon_dtypes, copy=False)
         #self.MM.measure()
         #self.MM.stop() 
         #gc.collect()        
         return amplicon_df
         
-    def extract_amplicon_errs(self, subgraphs, idx):  
-        amplicon_errs_lst = []     
-        for sub_graph in subgraphs:
-            edges_lst = [e for e in sub_graph.edges()]
-            if len(edges_lst) > 0:
-                nodes_lst = list(sub_graph.nodes)
-                for node in nodes_lst:
-                    node_count = sub_graph.nodes[node]['count']
-                    node_degree = sub_graph.degree[node]
-                    line = []
-                    if node_count < self.config.amplicon_low_freq and not sub_graph.nodes[node]['flag']:# and node_degree <= self.config.amplicon_error_node_degree:
-                        node_neis = [n for n in sub_graph.neighbors(node)]
-                        # nei2count = []
-                        nei_degree_count = []
-                        for nei in node_neis:
-                            nei_count = sub_graph.nodes[nei]['count']
-                            nei_degree = sub_graph.degree[nei]
-                            if nei_count > self.config.amplicon_high_freq:
-                                line = [nei, nei_count, nei_degree, node, node_count, node_degree]
-                                new_line = self.err_type_classification(line) 
-                                new_line.insert(0, idx) 
-                                # writer.writerow(new_line)
-                                # amplicon_df.loc[len(amplicon_df)] = new_line
-                                amplicon_errs_lst.append(new_line)
-                        idx += 1
-                        sub_graph.nodes[node]['flag'] = True
-                    else:
-                        continue 
+    def extract_amplicon_errs(self, shared_obs, ci):  
+        nodes, indptr, indices, counts, components = shared_obs
+        groups = []
+        # the visit flags never need to outlive one component, so track them
+        # locally instead of resetting node attributes up front
+        visited = set()
+        for a in components[ci]:
+            node_count = counts[a]
+            node_degree = indptr[a + 1] - indptr[a]
+            if node_count < self.config.amplicon_low_freq and a not in visited:# and node_degree <= self.config.amplicon_error_node_degree:
+                # select the qualifying neighbours with one vectorized
+                # comparison; err_type_classification only runs on hits
+                neis = indices[indptr[a]:indptr[a + 1]]
+                hits = neis[counts[neis] > self.config.amplicon_high_freq]
+                rows = []
+                for nei in hits:
+                    nei_count = counts[nei]
+                    nei_degree = indptr[nei + 1] - indptr[nei]
+                    line = [nodes[nei], nei_count, nei_degree, nodes[a], node_count, node_degree]
+                    # writer.writerow(new_line)
+                    rows.append(self.err_type_classification(line))
+                groups.append(rows)
+                visited.add(a)
+            else:
+                continue 
         #gc.collect()    
-        return amplicon_errs_lst, idx
+        return groups
   
     def draw_graph(self, graph, sub_dir, drawing_graph_num = 50):
         """
@@ -1381,9 +1555,11 @@ class DataGneration():
         # pos = nx.nx_agraph.graphviz_layout(graph, prog="neato")
         # color nodes the same in each connected subgraph
         i = 0
-        S = [graph.subgraph(c).copy() for c in nx.connected_components(graph)]
-        for s in S:
-            if nx.number_of_nodes(s) >= 10:
+        # filter the component node sets lazily; only the few components that
+        # are actually drawn ever become subgraph views
+        for c in nx.connected_components(graph):
+            if len(c) >= 10:
+                s = graph.subgraph(c)
                 labels = nx.get_node_attributes(s, 'count')
                 # A = nx.nx_agraph.to_agraph(s)
                 # print(type(A))
@@ -1402,39 +1578,39 @@ class DataGneration():
         #gc.collect()
         return
 
-    def extract_high_ambiguous_errs(self, sub_graphs, ii):
+    def extract_high_ambiguous_errs(self, shared_obs, ii):
         """
         extract high ambiguous errors from read graph
 
         Args:
-            subgraphs (class): Subgraphs of graph constructed using NetworkX.
+            shared_obs (tuple): CSR adjacency arrays of the read graph and its
+            component index arrays.
 
         Returns:
             DataFrame: One pandas dataframe saving high ambiguous errors
         """
  
-        sub_graph = sub_graphs[ii]
+        nodes, indptr, indices, counts, components = shared_obs
         high_ambi_lst = []
-        # for s in sub_graph:
-        edges_lst = [e for e in sub_graph.edges()]
-        for (a, b) in edges_lst:
-            a_count = sub_graph.nodes[a]['count']
-            b_count = sub_graph.nodes[b]['count']
-            a_degree = sub_graph.degree[a]
-            b_degree = sub_graph.degree[b]
-            if a_count > self.config.high_freq_thre and b_count > self.config.high_freq_thre: 
-                a2b = [a, a_count, a_degree, b, b_count, b_degree]
-                new_a2b = self.err_type_classification(a2b) 
-                # new_a2b.insert(0, idx)     
-                # high_ambi_lst.append(new_a2b)
-                # high_ambiguous_df.loc[len(high_ambiguous_df)] = new_a2b 
-                b2a = [b, b_count, b_degree, a, a_count, a_degree]
-                new_b2a = self.err_type_classification(b2a)
-                # new_b2a.insert(0, idx)
-                high_ambi_lst.append((new_a2b, new_b2a))
-                # high_ambiguous_df.loc[len(high_ambiguous_df)] = new_b2a
-                # idx += 1
-        del edges_lst
+        for a in components[ii]:
+            a_count = counts[a]
+            a_degree = indptr[a + 1] - indptr[a]
+            for k in range(indptr[a], indptr[a + 1]):
+                b = indices[k]
+                # visit each undirected edge once
+                if a >= b:
+                    continue
+                b_count = counts[b]
+                b_degree = indptr[b + 1] - indptr[b]
+                if a_count > self.config.high_freq_thre and b_count > self.config.high_freq_thre: 
+                    a2b = [nodes[a], a_count, a_degree, nodes[b], b_count, b_degree]
+                    new_a2b = self.err_type_classification(a2b) 
+                    # the reverse direction is the same edge seen from the
+                    # other read; no second classification
+                    new_b2a = _reverse_err_row(new_a2b)
+                    high_ambi_lst.append((new_a2b, new_b2a))
+                    # high_ambiguous_df.loc[len(high_ambiguous_df)] = new_b2a
+                    # idx += 1
         # if self.config.verbose:
         #     high_ambiguous_csv = self.config.result_dir + "high_ambiguous_1nt.csv"
         #     high_ambiguous_df.to_csv(high_ambiguous_csv, index=False)  
@@ -1447,81 +1623,80 @@ class DataGneration():
     def extract_genuine_ambi_errs_subgraph(self, shared_obs, ii):
         gen_lst = []
         ambi_lst = []
-        sub_graphs, edit_dis = shared_obs 
-        sub_graph = sub_graphs[ii]
-        edges_lst = [e for e in sub_graph.edges()]
-        if len(edges_lst) > 0:
-            nodes_lst = list(sub_graph.nodes)
-            for node in nodes_lst:
-                node_count = sub_graph.nodes[node]['count']
-                node_degree = sub_graph.degree[node]
-                if node_count <= self.config.max_error_freq and not sub_graph.nodes[node]['flag']:
-                    node_neis = [n for n in sub_graph.neighbors(node)]
-                    if node_degree == 1:
-                        nei = node_neis[0]
-                        nei_count = sub_graph.nodes[nei]['count']
-                        nei_degree = sub_graph.degree[nei]
+        nodes, indptr, indices, counts, components, edit_dis = shared_obs
+        # the visit flags never need to outlive one component, so track them
+        # locally instead of mutating node attributes on the shared graph
+        visited = set()
+        for node in components[ii]:
+            node_count = counts[node]
+            node_degree = indptr[node + 1] - indptr[node]
+            if node_count <= self.config.max_error_freq and node not in visited:
+                node_neis = indices[indptr[node]:indptr[node + 1]]
+                if node_degree == 1:
+                    nei = node_neis[0]
+                    nei_count = counts[nei]
+                    nei_degree = indptr[nei + 1] - indptr[nei]
+                    # if nei_count >= self.config.high_freq_thre:
+                    if nei_count > self.config.high_freq_thre:
+                        line = [nodes[nei], nei_count, nei_degree, nodes[node], node_count, node_degree]
+                        if edit_dis == 1:
+                            newline = self.err_type_classification(line)
+                            # gen_df.loc[len(gen_df)] = newline
+                            gen_lst.append(newline)
+                            del line, newline 
+                        else:
+                            # gen_df.loc[len(gen_df)] = line 
+                            gen_lst.append(line)
+                            del line                                   
+                # elif node_degree <= self.config.ambiguous_error_node_degree: # comment this line on 13 May 2023
+                else:
+                    high_num = 0
+                    nei2count = []
+                    for nei in node_neis:
+                        nei_count = counts[nei]
+                        nei_degree = indptr[nei + 1] - indptr[nei]
                         # if nei_count >= self.config.high_freq_thre:
                         if nei_count > self.config.high_freq_thre:
-                            line = [nei, nei_count, nei_degree, node, node_count, node_degree]
+                            high_num += 1
+                            nei2count.append((nei, nei_count))
+                    if high_num == 1:             
+                        nei2count.sort(key=lambda x:x[1], reverse=True)
+                        first_nei, first_nei_count = nei2count[0]
+                        first_nei_degree = indptr[first_nei + 1] - indptr[first_nei]
+                        # if first_nei_count >= self.config.high_freq_thre:
+                        if first_nei_count > self.config.high_freq_thre:
+                            line = [nodes[first_nei], first_nei_count, first_nei_degree, nodes[node], node_count, node_degree]
                             if edit_dis == 1:
                                 newline = self.err_type_classification(line)
                                 # gen_df.loc[len(gen_df)] = newline
                                 gen_lst.append(newline)
-                                del line, newline 
+                                del line, newline  
                             else:
                                 # gen_df.loc[len(gen_df)] = line 
                                 gen_lst.append(line)
-                                del line                                   
-                    # elif node_degree <= self.config.ambiguous_error_node_degree: # comment this line on 13 May 2023
+                                del line
                     else:
-                        high_num = 0
-                        nei2count = []
-                        for nei in node_neis:
-                            nei_count = sub_graph.nodes[nei]['count']
-                            nei_degree = sub_graph.degree[nei]
-                            # if nei_count >= self.config.high_freq_thre:
-                            if nei_count > self.config.high_freq_thre:
-                                high_num += 1
-                                nei2count.append((nei, nei_count))
-                        if high_num == 1:             
-                            nei2count.sort(key=lambda x:x[1], reverse=True)
-                            first_nei, first_nei_count = nei2count[0]
-                            first_nei_degree = sub_graph.degree[first_nei]
-                            # if first_nei_count >= self.config.high_freq_thre:
-                            if first_nei_count > self.config.high_freq_thre:
-                                line = [first_nei, first_nei_count, first_nei_degree, node, node_count, node_degree]
+                        # ambiguous errors
+                        tmp_lst = []
+                        for cre_nei, cur_nei_count in nei2count:
+                            # if cur_nei_count >= self.config.high_freq_thre:
+                            if cur_nei_count > self.config.high_freq_thre:
+                                cur_nei_degree = indptr[nei + 1] - indptr[nei]
+                                line = [nodes[cre_nei], cur_nei_count, cur_nei_degree, nodes[node], node_count, node_degree]
                                 if edit_dis == 1:
                                     newline = self.err_type_classification(line)
-                                    # gen_df.loc[len(gen_df)] = newline
-                                    gen_lst.append(newline)
-                                    del line, newline  
                                 else:
-                                    # gen_df.loc[len(gen_df)] = line 
-                                    gen_lst.append(line)
-                                    del line
-                        else:
-                            # ambiguous errors
-                            tmp_lst = []
-                            for cre_nei, cur_nei_count in nei2count:
-                                # if cur_nei_count >= self.config.high_freq_thre:
-                                if cur_nei_count > self.config.high_freq_thre:
-                                    cur_nei_degree = sub_graph.degree[nei]
-                                    line = [cre_nei, cur_nei_count, cur_nei_degree, node, node_count, node_degree]
-                                    if edit_dis == 1:
-                                        newline = self.err_type_classification(line)
-                                    else:
-                                        newline = line
-                                    # newline.insert(0, idx)
-                                    # ambi_df.loc[len(ambi_df)] = newline
-                                    tmp_lst.append(newline)
-                                    del newline 
-                            if tmp_lst:
-                                ambi_lst.append(tmp_lst)  
-                            # idx += 1 
-                    sub_graph.nodes[node]['flag'] = True        
-                else:
-                    continue
+                                    newline = line
+                                # newline.insert(0, idx)
+                                # ambi_df.loc[len(ambi_df)] = newline
+                                tmp_lst.append(newline)
+                                del newline 
+                        if tmp_lst:
+                            ambi_lst.append(tmp_lst)  
+                        # idx += 1 
+                visited.add(node)
+            else:
+                continue
         #gc.collect()
         return [gen_lst, ambi_lst]
 
@@ -1573,70 +1748,30 @@ class DataGneration():
             genu_columns = ["StartRead","StartReadCount", "StartDegree", "EndRead", "EndReadCount", "EndDegree"]
             genuine_csv = self.config.result_dir + "genuine2.csv"
 
-        subgraphs = [graph.subgraph(c).copy() for c in nx.connected_components(graph) if len(c) >= 2 ]#
-        
+        # flatten counts, degrees and adjacency into CSR arrays once so the
+        # workers index numpy arrays instead of networkx attribute dicts
+        nodes, id_of, indptr, indices, counts = _graph_to_csr(graph)
+        components = [np.fromiter((id_of[n] for n in c), dtype=np.int64, count=len(c)) for c in nx.connected_components(graph) if len(c) >= 2]
+        del id_of, graph
+
         self.logger.info("Extracting genuine and ambiguous errors...")
         genuine_lst = []
-        chunk_size = len(subgraphs) // self.config.chunks_num
-
-        if chunk_size > 1:
-            groups = [subgraphs[i:i+chunk_size] for i in range(0, len(subgraphs), chunk_size)]
-
-            self.logger.debug(len(groups))
-            # Write each group of subgraphs to separate files
-            gexf_files = []
-            for i, group in enumerate(groups):
-                group_G = nx.Graph()
-                for subgraph_nodes in group:
-                    group_G.add_edges_from(graph.subgraph(subgraph_nodes).edges())
-                    for node in subgraph_nodes:
-                        # self.logger.debug(node)
-                        group_G.nodes[node].update(graph.nodes[node])
-                # Generate the file name for the group
-                file_name = self.config.result_dir + f"group_{i}.gexf"
-
-                # Write the group of subgraphs to the file
-                nx.write_gexf(group_G, file_name)
-                gexf_files.append(file_name)
-            del groups, subgraphs, graph
-            ####
-            for gexf_file in gexf_files:
-                cur_graph = nx.read_gexf(gexf_file)
-                sub_graphs = [cur_graph.subgraph(c).copy() for c in nx.connected_components(cur_graph)]
-                try:
-                    subgraph_num = len(sub_graphs)
-                    shared_obs = sub_graphs, edit_dis
-                    with WorkerPool(self.config.num_workers, shared_objects=shared_obs, start_method='fork') as pool:
-                        cur_genuine_lsts = pool.imap(self.extract_umi_read_errs_subgraph, range(subgraph_num))
-                    del shared_obs    
-                except KeyboardInterrupt:
-                    # Handle termination signal (Ctrl+C)
-                    pool.terminate()  # Terminate the WorkerPool before exiting
-                except Exception:
-                    # Handle other exceptions
-                    pool.terminate()  # Terminate the WorkerPool before exiting
-                    raise
-                for item in cur_genuine_lsts:
-                    genuine_lst.extend(item)
-
-                os.remove(gexf_file)
-                del cur_graph, sub_graphs
-        else:
-            try:
-                subgraph_num = len(subgraphs)
-                shared_obs = subgraphs, edit_dis
-                with WorkerPool(self.config.num_workers, shared_objects=shared_obs, start_method='fork') as pool:
-                    cur_genuine_lsts = pool.imap(self.extract_umi_read_errs_subgraph, range(subgraph_num))
-                del shared_obs, subgraphs, graph
-            except KeyboardInterrupt:
-                pool.terminate()  # Terminate the WorkerPool before exiting
-            except Exception:
-                # Handle other exceptions
-                pool.terminate()  # Terminate the WorkerPool before exiting
-                raise
-            
-            for item in cur_genuine_lsts:
-                genuine_lst.extend(item)
+        component_num = len(components)
+        try:
+            shared_obs = nodes, indptr, indices, counts, components, edit_dis
+            with WorkerPool(self.config.num_workers, shared_objects=shared_obs, start_method='fork') as pool:
+                cur_genuine_lsts = pool.imap(self.extract_umi_read_errs_subgraph, range(component_num))
+            del shared_obs
+        except KeyboardInterrupt:
+            pool.terminate()  # Terminate the WorkerPool before exiting
+        except Exception:
+            # Handle other exceptions
+            pool.terminate()  # Terminate the WorkerPool before exiting
+            raise
+        del components
+
+        for item in cur_genuine_lsts:
+            genuine_lst.extend(item)
 
         genuine_df = pd.DataFrame(genuine_lst, columns=genu_columns)
 
@@ -1648,39 +1783,40 @@ class DataGneration():
 
     def extract_umi_read_errs_subgraph(self, shared_obs, ii):
         gen_lst = []
-        sub_graphs, edit_dis = shared_obs 
-        sub_graph = sub_graphs[ii]
-        edges_lst = [e for e in sub_graph.edges()]
-        if len(edges_lst) > 0:
-            nodes_lst = list(sub_graph.nodes)
-            for node in nodes_lst:
-                node_count = sub_graph.nodes[node]['count']
-                node_degree = sub_graph.degree[node]            
-                if node_degree >= 1 and node_count <= self.config.max_error_freq and not sub_graph.nodes[node]['flag']:
-                    node_neis = [n for n in sub_graph.neighbors(node)]
-                    nei_degree_count = []
-                    for nei in node_neis:
-                        nei_count = sub_graph.nodes[nei]['count']
-                        nei_degree = sub_graph.degree[nei]
-                        # nei2count.append((nei, nei_count))
-                        # tt = nei_degree + nei_count
-                        ss = (nei_count/node_count) * (nei_degree/node_degree)
-                        nei_degree_count.append((nei, ss, nei_count))
-                    nei_degree_count.sort(key=lambda x:x[1], reverse=True)
-                    first_nei, ss, first_nei_count = nei_degree_count[0]
-                    first_nei_degree = sub_graph.degree[first_nei]
-                    if first_nei_count > self.config.high_freq_thre:
-                        line = [first_nei, first_nei_count, first_nei_degree, node, node_count, node_degree]
-                        if edit_dis == 1:
-                            newline = self.err_type_classification(line)
-                            gen_lst.append(newline)
-                            del line, newline 
-                        else:
-                            gen_lst.append(line)
-                            del line  
-                    sub_graph.nodes[node]['flag'] = True
-                else:
-                    continue
+        nodes, indptr, indices, counts, components, edit_dis = shared_obs
+        # the visit flags never need to outlive one component, so track them
+        # locally instead of mutating node attributes on the shared graph
+        visited = set()
+        for a in components[ii]:
+            node_count = counts[a]
+            node_degree = indptr[a + 1] - indptr[a]
+            if node_degree >= 1 and node_count <= self.config.max_error_freq and a not in visited:
+                # same one-pass top-1 selection as the umi genuine worker
+                first_nei = -1
+                best_ss = -1.0
+                first_nei_count = 0
+                for k in range(indptr[a], indptr[a + 1]):
+                    nei = indices[k]
+                    nei_count = counts[nei]
+                    nei_degree = indptr[nei + 1] - indptr[nei]
+                    ss = (nei_count/node_count) * (nei_degree/node_degree)
+                    if ss > best_ss:
+                        best_ss = ss
+                        first_nei = nei
+                        first_nei_count = nei_count
+                first_nei_degree = indptr[first_nei + 1] - indptr[first_nei]
+                if first_nei_count > self.config.high_freq_thre:
+                    line = [nodes[first_nei], first_nei_count, first_nei_degree, nodes[a], node_count, node_degree]
+                    if edit_dis == 1:
+                        newline = self.err_type_classification(line)
+                        gen_lst.append(newline)
+                        del line, newline
+                    else:
+                        gen_lst.append(line)
+                        del line
+                visited.add(a)
+            else:
+                continue
         return gen_lst
 
     '''
@@ -12,7 +12,7 @@ from noise2read.utils import *
 from noise2read.data_generation import DataGneration
 from noise2read.error_orrection import ErrorCorrection
 # from noise2read.data_analysis import DataAnalysis
-import editdistance
+from rapidfuzz.distance import Levenshtein
 from Bio.Seq import Seq
 import json
 # import gc
@@ -119,7 +119,7 @@ class DataProcessing():
                 if max_key_count >= (total_count-max_key_count):     
                     for i in ids:
                         cur_seq = str(id2read[i].seq)
-                        dis = editdistance.eval(max_key, cur_seq)
+                        dis = Levenshtein.distance(max_key, cur_seq)
                         desc = "umi:" + str(umi) + "//" + str(id2read[i].description)
                         if dis == 0:
                             # n += 1
@@ -205,7 +205,7 @@ class DataProcessing():
                     # if max_key_count >= 4:
                         for read_id in seq_ids:
                             cur_seq = str(id2read[read_id].seq)
-                            dis = editdistance.eval(max_key, cur_seq)
+                            dis = Levenshtein.distance(max_key, cur_seq)
                             desc = "umi:" + str(umi) + "//" + str(id2read[read_id].description)
                             if dis == 0:
                                 nn += 1
@@ -239,7 +239,7 @@ class DataProcessing():
                 elif len(sorted_lst) == 1:
                     for i in seq_ids:
                         cur_seq = str(id2read[i].seq)
-                        dis = editdistance.eval(max_key, cur_seq)
+                        dis = Levenshtein.distance(max_key, cur_seq)
                         desc = "umi:" + str(umi) + "//" + str(id2read[i].description)
                         if dis == 0:
                             n += 1
@@ -363,7 +363,7 @@ class DataProcessing():
                                 sorted_seq2count_above = dict(sorted(high_seq2count.items(), key=lambda item: item[1]), reverse=True)  
                                 # print(sorted_seq2count_above)                       
                                 for high_read, high_count in sorted_seq2count_above.items():
-                                    dis = editdistance.eval(high_read, cur_seq)
+                                    dis = Levenshtein.distance(high_read, cur_seq, score_cutoff=self.config.read_edit_dif)
                                     if dis <= self.config.read_edit_dif:
                                     # if dis <= 4:
                                         nn += 1
@@ -476,7 +476,7 @@ class DataProcessing():
 
         for i in range(n):
             for j in range(i + 1, n):
-                distance = editdistance.eval(strings[i], strings[j])
+                distance = Levenshtein.distance(strings[i], strings[j])
                 distances[i][j] = distance
                 distances[j][i] = distance
         #gc.collect()
@@ -486,7 +486,7 @@ class DataProcessing():
         smallest_edit_dis = 100000
         target_read = ""
         for seq in seq_lst:
-            dis = editdistance.eval(seq, read)
+            dis = Levenshtein.distance(seq, read)
             if dis < smallest_edit_dis:
                 smallest_edit_dis = dis
                 target_read = seq
@@ -6,7 +6,7 @@
 
 from Bio import SeqIO
 import os
-import editdistance
+from rapidfuzz.distance import Levenshtein
 import operator
 from collections import Counter
 from noise2read.utils import *
@@ -221,7 +221,7 @@ class IsolatesErrorCorrection():
                 temp_bcool_name_lst = []
                 for name in bcool_names:
                     ori_seq = str(original_records[name].seq)
-                    if editdistance.eval(seq, ori_seq) <= 1:
+                    if Levenshtein.distance(seq, ori_seq, score_cutoff=1) <= 1:
                         temp_bcool_name_lst.append(name)                        
                 if len(temp_bcool_name_lst) >= 2:
                     keep_inter_bcool_name_lst.extend(temp_bcool_name_lst)
@@ -254,7 +254,7 @@ class IsolatesErrorCorrection():
                 temp_bcool_name_lst = []
                 for name in bcool_names:
                     ori_seq = str(original_records[name].seq)
-                    if editdistance.eval(new_seq, ori_seq) <= 3:
+                    if Levenshtein.distance(new_seq, ori_seq, score_cutoff=3) <= 3:
                         temp_bcool_name_lst.append(name)
                 if len(temp_bcool_name_lst) >= 2:
                     keep_new_seq_bcool_name_lst.extend(temp_bcool_name_lst)
@@ -335,8 +335,10 @@ class IsolatesErrorCorrection():
         del records
         fa_records = []
         name_len = len(name_lst)
+        self.logger.info("Convert fq to fa")
+        mi = max(1, name_len // self.min_iters)
         with WorkerPool(self.num_workers, shared_objects=id2seq_desc, start_method='fork') as pool:
-            with tqdm(total=name_len, desc=self.logger.info("Convert fq to fa"), miniters=int(name_len/self.min_iters)) as pbar:   
+            with tqdm(total=name_len, desc="Convert fq to fa", miniters=mi) as pbar:   
                 for tmp_rec in pool.imap(self.fq2fa, name_lst):
                     fa_records.append(tmp_rec)
                     pbar.update() 
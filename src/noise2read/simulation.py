@@ -390,8 +390,9 @@ class Simulation():
         records_dict, file_type = self.parse_data_dict(data_set)
         sub_records = []
         shared_objects = records_dict, file_type
+        self.logger.info("Extract Seqs")
         with WorkerPool(num_workers, shared_objects=shared_objects, start_method='fork') as pool:
-            with tqdm(total=len(name_lst), desc=self.logger.info("Extract Seqs")) as pbar:   
+            with tqdm(total=len(name_lst), desc="Extract Seqs") as pbar:   
                 for tmp_rec in pool.imap(self.extract_seq, name_lst):
                     # print(tmp_rec)
                     sub_records.append(tmp_rec)
@@ -5,6 +5,7 @@ from Bio.Seq import Seq
 from Bio.SeqRecord import SeqRecord
 import copy
 from noise2read.utils import *
+from rapidfuzz.distance import Levenshtein
 import sys
 from collections import Counter
 
@@ -72,7 +73,7 @@ class UMIReadErrorCorrection():
                             closest_read = None
                             dis = float('inf')
                             for top_read in top_reads:
-                                cur_dis = editdistance.eval(cur_read, top_read)
+                                cur_dis = Levenshtein.distance(cur_read, top_read)
 
                                 if cur_dis < dis:
                                     dis = cur_dis
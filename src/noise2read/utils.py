@@ -12,7 +12,7 @@ import logging
 from colorlog import ColoredFormatter
 import copy
 import random
-import editdistance
+from rapidfuzz.distance import Levenshtein
 import os
 import datetime
 import tracemalloc
@@ -153,8 +153,9 @@ def extract_seqs(num_workers, name_lst, data_set, sub_dataset, logger):
     records_dict, file_type = parse_data_dict(data_set)
     sub_records = []
     shared_objects = records_dict, file_type
+    logger.info("Extract Seqs")
     with WorkerPool(num_workers, shared_objects=shared_objects, start_method='fork') as pool:
-        with tqdm(total=len(name_lst), desc=logger.info("Extract Seqs")) as pbar:   
+        with tqdm(total=len(name_lst), desc="Extract Seqs") as pbar:   
             for tmp_rec in pool.imap(extract_seq, name_lst):
                 # print(tmp_rec)
                 sub_records.append(tmp_rec)
@@ -257,12 +258,30 @@ def seq2insertion(read):
     return set(editdis1_list)
 
 def enumerate_ed1_seqs(read):
-    possible_ed1 = []
-    possible_ed1.extend(seq2deletion(read))
-    possible_ed1.extend(seq2substitution(read))
-    possible_ed1.extend(seq2insertion(read))
-    #gc.collect()
-    return set(possible_ed1)
+    # mutate one reusable bytearray instead of deep-copying the read once per
+    # candidate; non-ACGT positions never substitute, matching sub_base
+    possible_ed1 = set()
+    buf = bytearray(read, "ascii")
+    n = len(buf)
+    # substitution
+    for i in range(n):
+        orig = buf[i]
+        if orig in b"ACGT":
+            for base in b"ACGT":
+                if base != orig:
+                    buf[i] = base
+                    possible_ed1.add(buf.decode())
+            buf[i] = orig
+    # deletion
+    for i in range(n):
+        possible_ed1.add(read[:i] + read[i+1:])
+    # insertion
+    for i in range(n + 1):
+        head = read[:i]
+        tail = read[i:]
+        for base in "AGCT":
+            possible_ed1.add(head + base + tail)
+    return possible_ed1
 
 def enumerate_ed2_seqs(read):
     # possible_ed1 = self.enumerate_ed1_seqs(read)
@@ -303,7 +322,7 @@ def error_type_classification(read1, read2):
     f_len = len(read1)
     s_len = len(read2)  
     # position = -1  
-    dis = editdistance.eval(read1, read2)
+    dis = Levenshtein.distance(read1, read2, score_cutoff=1)
     # print(dis)
     if dis == 1:              
         if f_len == s_len:
@@ -0,0 +1,47 @@
+import unittest
+import logging
+import os
+import tempfile
+from noise2read.data_generation import DataGneration, _reverse_err_row
+
+class TestReverseErrRow(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        class Config:
+            pass
+        config = Config()
+        config.result_dir = tempfile.mkdtemp() + os.sep
+        config.input_file = 'test.fastq'
+        logger = logging.getLogger('test_high_ambiguous')
+        logger.addHandler(logging.NullHandler())
+        cls.DG = DataGneration(logger, config)
+
+    def check_pair(self, read_a, read_b):
+        forward = self.DG.err_type_classification([read_a, 10, 3, read_b, 8, 2])
+        derived = _reverse_err_row(forward)
+        direct = self.DG.err_type_classification([read_b, 8, 2, read_a, 10, 3])
+        self.assertEqual(derived, direct)
+
+    def test_substitution(self):
+        read = 'ACGTACGTAC'
+        # first, middle and last position
+        for i, base in ((0, 'T'), (4, 'G'), (9, 'G')):
+            self.check_pair(read, read[:i] + base + read[i + 1:])
+
+    def test_deletion(self):
+        read = 'ACGTACGTAC'
+        for i in (0, 5, 9):
+            self.check_pair(read, read[:i] + read[i + 1:])
+
+    def test_insertion(self):
+        read = 'ACGTACGTAC'
+        for i, base in ((0, 'G'), (5, 'T'), (10, 'A')):
+            self.check_pair(read, read[:i] + base + read[i:])
+
+    def test_insertion_of_matching_base_at_end(self):
+        # inserted base equals the preceding one, so the reads only differ
+        # past the end of the shorter read
+        self.check_pair('ACGTACGTAC', 'ACGTACGTACC')
+
+if __name__ == '__main__':
+    unittest.main()